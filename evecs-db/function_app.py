@@ -1,5 +1,6 @@
 import logging
 import json
+import orjson
 import jsonschema
 import os
 import requests
@@ -261,16 +262,18 @@ def create_location_endpoint(req: func.HttpRequest) -> func.HttpResponse:
     """Endpoint for creating a new location."""
     result = create_location(req, LocationsContainerProxy)
     return func.HttpResponse(
-        body=json.dumps(result["body"]),
-        status_code=result["status_code"]
+        body=orjson.dumps(result["body"]),
+        status_code=result["status_code"],
+        mimetype="application/json"
     )
 
 @app.route(route="get_location", auth_level=func.AuthLevel.FUNCTION, methods=['GET', 'POST'])
 def get_location_endpoint(req: func.HttpRequest) -> func.HttpResponse:
     result = get_location(req, LocationsContainerProxy)
     return func.HttpResponse(
-        body=json.dumps(result["body"]),
-        status_code=result["status_code"]
+        body=orjson.dumps(result["body"]),
+        status_code=result["status_code"],
+        mimetype="application/json"
     )
 
 @app.route(route="delete_location", auth_level=func.AuthLevel.FUNCTION, methods=['POST', 'DELETE'])
@@ -278,8 +281,9 @@ def delete_location_endpoint(req: func.HttpRequest) -> func.HttpResponse:
     """Endpoint for deleting a location by location_id."""
     result = delete_location(req, LocationsContainerProxy)
     return func.HttpResponse(
-        body=json.dumps(result["body"]),
-        status_code=result["status_code"]
+        body=orjson.dumps(result["body"]),
+        status_code=result["status_code"],
+        mimetype="application/json"
     )
 
 @app.route(route="edit_location", auth_level=func.AuthLevel.FUNCTION, methods=['PUT', 'POST'])
@@ -287,8 +291,9 @@ def edit_location_endpoint(req: func.HttpRequest) -> func.HttpResponse:
     """Endpoint for editing an existing location."""
     result = edit_location(req, LocationsContainerProxy)
     return func.HttpResponse(
-        body=json.dumps(result["body"]),
-        status_code=result["status_code"]
+        body=orjson.dumps(result["body"]),
+        status_code=result["status_code"],
+        mimetype="application/json"
     )
 
 @app.route(route="get_account_details", methods=['GET', 'POST'])
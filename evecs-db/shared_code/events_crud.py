@@ -13,6 +13,7 @@ import string
 import random
 
 from shared_code.ticket_crud import get_ticket
+from shared_code.location_crud import invalidate_location_cache
 
 # Suppose we have the following global sets for validating tags/groups:
 valid_tags = {"Lecture", "Society", "Leisure", "Sports", "Music", "Compulsory", "Optional", "Academic"} 
@@ -314,6 +315,7 @@ def create_event(req, EventsContainerProxy, LocationsContainerProxy, UsersContai
 
         # ---- Update the location document in Cosmos (important!) ----
         LocationsContainerProxy.replace_item(item=location_doc, body=location_doc)
+        invalidate_location_cache(location_doc["location_id"])
 
         return {
             "status_code": 201,
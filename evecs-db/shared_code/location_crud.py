@@ -2,13 +2,17 @@
 
 import logging
 import json
-import jsonschema
+import orjson
+import fastjsonschema
 import uuid
 import os
-import traceback
+import threading
 from datetime import timedelta, datetime
 from dateutil import parser, tz
 from urllib.parse import urlparse
+from azure.core import MatchConditions
+from azure.cosmos.exceptions import CosmosAccessConditionFailedError, CosmosResourceExistsError, CosmosResourceNotFoundError
+from cachetools import TTLCache
 
 # Load location schema for validation, if needed for multiple functions
 def load_location_schema():
@@ -18,11 +22,128 @@ def load_location_schema():
 
 location_schema = load_location_schema()
 
+# Compile the schema once into a specialised validation function reused by every request
+_fast_validate = fastjsonschema.compile(location_schema)
 
-def create_location(req, LocationsContainerProxy, location_schema=location_schema):
+# Per-property validators, so edits only re-check the fields they actually change
+_field_validators = {
+    key: fastjsonschema.compile(subschema)
+    for key, subschema in location_schema["properties"].items()
+}
+
+# Per-worker cache of location docs served by get_location, keyed by location_id.
+# Any code that writes a location doc must call invalidate_location_cache afterwards.
+# TTLCache isn't thread-safe and sync handlers run on the worker's thread pool,
+# so every access goes through _loc_cache_lock. _loc_cache_generation is bumped on
+# every invalidation, so a read that raced with a write never stores the stale doc.
+_loc_cache = TTLCache(maxsize=1024, ttl=60)
+_loc_cache_lock = threading.Lock()
+_loc_cache_generation = 0
+
+# Maximum number of locations returned per get_location list page
+LOCATIONS_PAGE_SIZE = 1000
+
+# Query text kept byte-identical across requests so Cosmos can reuse cached query plans.
+# Existence probe for location_name: only existence matters, so project a single id.
+_Q_LOC_BY_NAME = "SELECT TOP 1 c.id FROM c WHERE c.location_name = @loc_name"
+# List-all page, projected to the fields callers need
+_Q_LIST_LOCATIONS = "SELECT c.location_id, c.location_name, c.rooms FROM c"
+# Fallback lookup for locations created before id mirrored location_id
+_Q_LOC_BY_ID = "SELECT TOP 1 * FROM c WHERE c.location_id = @loc_id"
+
+# Location fields edit_location is allowed to change
+_UPDATABLE_KEYS = frozenset(("location_id", "location_name", "events_ids", "rooms"))
+
+# Fields every entry in a location's rooms array must provide
+_REQUIRED_ROOM_FIELDS = frozenset(("room_name", "capacity"))
+
+
+def _get_json_body(req, silent=False):
+    """
+    Parses the raw request body with orjson; raises ValueError on invalid JSON like req.get_json().
+    With silent=True, an empty, invalid or non-object body returns {} instead.
+    """
+    if not silent:
+        return orjson.loads(req.get_body())
+    try:
+        body = orjson.loads(req.get_body())
+    except ValueError:
+        return {}
+    return body if isinstance(body, dict) else {}
+
+
+def invalidate_location_cache(location_id):
+    """Drops location_id from the get_location cache; call after writing a location doc."""
+    global _loc_cache_generation
+    with _loc_cache_lock:
+        _loc_cache.pop(location_id, None)
+        _loc_cache_generation += 1
+
+
+def _cache_lookup(location_id):
+    """Returns (cached doc or None, current cache generation) for location_id."""
+    with _loc_cache_lock:
+        return _loc_cache.get(location_id), _loc_cache_generation
+
+
+def _cache_fill(location_id, location_doc, generation):
+    """Caches location_doc unless an invalidation happened since generation was read."""
+    with _loc_cache_lock:
+        if _loc_cache_generation == generation:
+            _loc_cache[location_id] = location_doc
+
+
+def _read_location_doc(LocationsContainerProxy, location_id):
+    """
+    Returns the location doc for location_id, or None if it doesn't exist.
+    New docs are point-read (id == location_id == partition key); older docs with a
+    random id are found with a single-partition query on location_id instead.
+    """
+    try:
+        return LocationsContainerProxy.read_item(item=location_id, partition_key=location_id)
+    except CosmosResourceNotFoundError:
+        pass
+
+    return next(iter(LocationsContainerProxy.query_items(
+        query=_Q_LOC_BY_ID,
+        parameters=[{"name": "@loc_id", "value": location_id}],
+        partition_key=location_id,
+        max_item_count=1
+    )), None)
+
+
+def _parse_limit(limit, from_query):
+    """
+    Returns limit as an int, or None if it isn't one. Query-string values (from_query=True)
+    arrive as str and are parsed with int(); JSON values must be integers (strings, bools
+    and non-integral floats are rejected rather than coerced).
+    """
+    if isinstance(limit, str):
+        if not from_query:
+            return None
+        try:
+            return int(limit)
+        except ValueError:
+            return None
+    if isinstance(limit, bool):
+        return None
+    if isinstance(limit, int):
+        return limit
+    if isinstance(limit, float) and limit.is_integer():
+        return int(limit)
+    return None
+
+
+def _uuid4_batch(count):
+    """Returns count random UUID4 strings drawn from a single os.urandom call."""
+    buf = os.urandom(16 * count)
+    return [str(uuid.UUID(bytes=buf[i:i + 16], version=4)) for i in range(0, 16 * count, 16)]
+
+
+def create_location(req, LocationsContainerProxy):
     """
     Creates a new location document in the Locations container.
-    Required fields (per location_schema or as listed): 
+    Required fields (per the location schema or as listed): 
       [
          "location_id",
          "location_name",
@@ -32,11 +153,11 @@ def create_location(req, LocationsContainerProxy, location_schema=location_schem
     Additional checks:
       - location_id and location_name must be unique across all documents
       - Validate rooms array structure: room_id must be unique in that location
-      - Type checks if no location_schema is provided, or schema-based validation if location_schema is available
+      - Schema-based validation against schemas/location.json (compiled once at import)
       If successful, returns 202.
     """
     try:
-        body = req.get_json()
+        body = _get_json_body(req)
 
         # 1 Quick mandatory field check
         required_fields = ["location_name", "rooms"]
@@ -46,30 +167,42 @@ def create_location(req, LocationsContainerProxy, location_schema=location_schem
                 "status_code": 400,
                 "body": {"error": f"Missing mandatory field(s): {missing}"}
             }
-        
-        for room in body["rooms"]:
-            if "room_name" not in room or "capacity" not in room:
+
+        rooms = body["rooms"]
+        if not isinstance(rooms, list):
+            return {
+                "status_code": 400,
+                "body": {"error": "'rooms' must be an array."}
+            }
+
+        # Check each room's mandatory fields and assign its unique ID in a single pass
+        location_id, *room_ids = _uuid4_batch(len(rooms) + 1)
+        for room, room_id in zip(rooms, room_ids):
+            if not isinstance(room, dict):
+                return {
+                    "status_code": 400,
+                    "body": {"error": "Each entry in 'rooms' must be an object."}
+                }
+            missing_room_fields = _REQUIRED_ROOM_FIELDS - room.keys()
+            if missing_room_fields:
                 return {
                     "status_code": 400,
-                    "body": {"error": "Missing mandatory field 'room_name' in rooms."}
+                    "body": {"error": f"Missing mandatory field(s) {sorted(missing_room_fields)} in rooms."}
                 }
-    
+            room["room_id"] = room_id
+
         # 2 Check uniqueness of location_name across all docs
-        check_query = (
-            "SELECT * FROM c "
-            "WHERE c.location_name = @loc_name"
-        )
-        check_params = [
-            {"name": "@loc_name", "value": body["location_name"]}
-        ]
-        existing_docs = list(
+        # A unique-key policy can't replace this: Cosmos enforces unique keys per logical
+        # partition, and each location sits alone in its own location_id partition.
+        existing_doc = next(iter(
             LocationsContainerProxy.query_items(
-                query=check_query,
-                parameters=check_params,
-                enable_cross_partition_query=True
+                query=_Q_LOC_BY_NAME,
+                parameters=[{"name": "@loc_name", "value": body["location_name"]}],
+                enable_cross_partition_query=True,
+                max_item_count=1
             )
-        )
-        if existing_docs:
+        ), None)
+        if existing_doc is not None:
             return {
                 "status_code": 400,
                 "body": {
@@ -81,35 +214,37 @@ def create_location(req, LocationsContainerProxy, location_schema=location_schem
 
         # 3 Validate the document against the schema
         try:
-            jsonschema.validate(instance=body, schema=location_schema)
-        except jsonschema.exceptions.ValidationError as ve:
+            _fast_validate(body)
+        except fastjsonschema.JsonSchemaException as ve:
             return {
                 "status_code": 400,
-                "body": {"error": f"JSON schema validation error: {str(ve)}"}
+                "body": {"error": f"JSON schema validation error: {ve.message}"}
             }
 
         # 4 All checks pass -> create new location
-        location_id = str(uuid.uuid4())
-
-        # 4.1 Generate unique IDs for each room
-        rooms = body["rooms"]
-        for room in rooms:
-            room["room_id"] = str(uuid.uuid4())
-
-        #4.2 Create the new document
+        # 4.1 Create the new document
+        # id mirrors location_id (the partition key) so reads and deletes can be point operations
         new_doc = {
-            "id": str(uuid.uuid4()),
+            "id": location_id,
             "location_id": location_id,
             "location_name": body["location_name"],
             "events_ids": body["events_ids"],
             "rooms": rooms
         }
-        # 4.3 Include additional fields
+        # 4.2 Include additional fields
         for key, val in body.items():
             if key not in new_doc and key in location_schema["properties"]:
                 new_doc[key] = val
 
-        LocationsContainerProxy.create_item(new_doc)
+        try:
+            LocationsContainerProxy.create_item(new_doc)
+        except CosmosResourceExistsError:
+            # The only conflict possible here is the random id colliding with an existing doc;
+            # name uniqueness is handled by the query in step 2
+            return {
+                "status_code": 409,
+                "body": {"error": "Generated location id already exists, please retry."}
+            }
 
         return {
             "status_code": 202,
@@ -119,9 +254,8 @@ def create_location(req, LocationsContainerProxy, location_schema=location_schem
             }
         }
 
-    except Exception as e:
-        logging.error(f"Error creating location: {e}")
-        logging.error(traceback.format_exc())
+    except Exception:
+        logging.exception("Error creating location")
         return {
             "status_code": 500,
             "body": {"error": "Internal Server Error"}
@@ -137,7 +271,7 @@ def delete_location(req, LocationsContainerProxy):
     try:
         # Handle both GET and POST methods for location_id
         if req.method == 'POST':
-            body = req.get_json()
+            body = _get_json_body(req, silent=True)
             location_id = body.get("location_id")
         else:
             location_id = req.params.get("location_id")
@@ -148,48 +282,43 @@ def delete_location(req, LocationsContainerProxy):
                 "body": {"error": "Missing 'location_id' parameter"}
             }
 
-        # Fetch the doc
-        query = "SELECT * FROM c WHERE c.location_id = @loc_id"
-        params = [{"name": "@loc_id", "value": location_id}]
-        docs = list(LocationsContainerProxy.query_items(
-            query=query,
-            parameters=params,
-            enable_cross_partition_query=True
-        ))
-
-        if not docs:
-            return {
-                "status_code": 404,
-                "body": {"error": f"Location '{location_id}' not found"}
-            }
-
-        doc_to_delete = docs[0]
-        # Cosmos DB requires the partition key (often location_id) and the internal 'id'
-        item_id = doc_to_delete["id"]
-        partition_key = doc_to_delete["location_id"]  # or whatever your partition key is
-
-        LocationsContainerProxy.delete_item(item=item_id, partition_key=partition_key)
+        # id == location_id == partition key, so delete directly without a lookup query
+        try:
+            LocationsContainerProxy.delete_item(item=location_id, partition_key=location_id)
+        except CosmosResourceNotFoundError:
+            # Older docs have a random id; look it up within the location_id partition
+            doc_to_delete = _read_location_doc(LocationsContainerProxy, location_id)
+            if doc_to_delete is None:
+                return {
+                    "status_code": 404,
+                    "body": {"error": f"Location '{location_id}' not found"}
+                }
+            LocationsContainerProxy.delete_item(item=doc_to_delete["id"], partition_key=location_id)
+        invalidate_location_cache(location_id)
 
         return {
             "status_code": 200,
             "body": {"message": f"Location '{location_id}' deleted successfully."}
         }
 
-    except Exception as e:
-        logging.error(f"Error deleting location: {e}")
-        logging.error(traceback.format_exc())
+    except Exception:
+        logging.exception("Error deleting location")
         return {
             "status_code": 500,
             "body": {"error": "Internal Server Error"}
         }
 
 
-def get_location(req, LocationsContainerProxy, location_schema=location_schema):
+def get_location(req, LocationsContainerProxy):
     """
     Gets location(s) from the database.
     Input:
       - location_id (optional): if provided, returns specific location
-                              if not provided, returns all locations
+                              if not provided, returns a page of all locations
+      - continuation_token (optional): token from a previous list response,
+                              used to fetch the next page of locations
+      - limit (optional): page size for the list, at most LOCATIONS_PAGE_SIZE
+    List pages contain only location_id, location_name and rooms of each location.
     Can be called via GET or POST.
     For GET: use query parameters
     For POST: use JSON body
@@ -198,53 +327,61 @@ def get_location(req, LocationsContainerProxy, location_schema=location_schema):
     try:
         # Handle both GET and POST methods
         if req.method == 'GET':
-            location_id = req.params.get("location_id") if req.params else None
+            params = req.params or {}
         else:  # POST
-            body = req.get_json() if req.get_json() else {}
-            location_id = body.get("location_id")
+            params = _get_json_body(req, silent=True)
+        location_id = params.get("location_id")
+        continuation_token = params.get("continuation_token")
+        limit = params.get("limit", LOCATIONS_PAGE_SIZE)
 
         if location_id:
-            # Get specific location
-            query = "SELECT * FROM c WHERE c.location_id = @lid"
-            params = [{"name": "@lid", "value": location_id}]
-            docs = list(LocationsContainerProxy.query_items(
-                query=query,
-                parameters=params,
-                enable_cross_partition_query=True
-            ))
-
-            if not docs:
-                return {
-                    "status_code": 404,
-                    "body": {"error": f"Location '{location_id}' not found."}
-                }
+            location_doc, generation = _cache_lookup(location_id)
+            if location_doc is None:
+                location_doc = _read_location_doc(LocationsContainerProxy, location_id)
+                if location_doc is None:
+                    return {
+                        "status_code": 404,
+                        "body": {"error": f"Location '{location_id}' not found."}
+                    }
+                _cache_fill(location_id, location_doc, generation)
 
             return {
                 "status_code": 200,
-                "body": {"location": docs[0]}
+                "body": {"location": location_doc}
             }
         else:
-            # Get all locations
-            query = "SELECT * FROM c"
-            docs = list(LocationsContainerProxy.query_items(
-                query=query,
-                enable_cross_partition_query=True
-            ))
+            limit = _parse_limit(limit, from_query=req.method == 'GET')
+            if limit is None or not 1 <= limit <= LOCATIONS_PAGE_SIZE:
+                return {
+                    "status_code": 400,
+                    "body": {"error": f"'limit' must be an integer between 1 and {LOCATIONS_PAGE_SIZE}."}
+                }
+
+            # Get all locations, one page per request; callers follow continuation_token for more
+            pages = LocationsContainerProxy.query_items(
+                query=_Q_LIST_LOCATIONS,
+                enable_cross_partition_query=True,
+                max_item_count=limit
+            ).by_page(continuation_token)
+            docs = list(next(pages, []))
 
             return {
                 "status_code": 200,
-                "body": {"locations": docs}
+                "body": {
+                    "locations": docs,
+                    "continuation_token": pages.continuation_token
+                }
             }
 
-    except Exception as e:
-        logging.error(f"Error getting location(s): {str(e)}")
+    except Exception:
+        logging.exception("Error getting location(s)")
         return {
             "status_code": 500,
             "body": {"error": "Internal server error"}
         }
 
 
-def edit_location(req, LocationsContainerProxy, location_schema=location_schema):
+def edit_location(req, LocationsContainerProxy):
     """
     Edits an existing location document. Required fields in the location schema are:
        ["location_id", "location_name", "events_ids", "rooms"]
@@ -254,7 +391,7 @@ def edit_location(req, LocationsContainerProxy, location_schema=location_schema)
     - Otherwise upsert/replace the location and return 200/201
     """
     try:
-        body = req.get_json()
+        body = _get_json_body(req)
         if not body or not isinstance(body, dict):
             return {
                 "status_code": 400,
@@ -269,50 +406,51 @@ def edit_location(req, LocationsContainerProxy, location_schema=location_schema)
                 "body": {"error": "Missing 'location_id' field to identify the document to edit."}
             }
 
-        # Retrieve the existing doc
-        query = "SELECT * FROM c WHERE c.location_id = @loc_id"
-        params = [{"name": "@loc_id", "value": location_id}]
-        docs = list(LocationsContainerProxy.query_items(
-            query=query,
-            parameters=params,
-            enable_cross_partition_query=True
-        ))
-        if not docs:
+        # Collect updates from body; "id" is the internal Cosmos ID and is never updatable
+        updates = {key: val for key, val in body.items() if key in _UPDATABLE_KEYS}
+        if not updates:
             return {
-                "status_code": 404,
-                "body": {"error": f"Location '{location_id}' not found, cannot edit."}
+                "status_code": 400,
+                "body": {"error": "No updatable fields specified in request body."}
             }
 
-        location_doc = docs[0]
-
-        # Merge updates from body into the existing doc
-        # We skip "id" because that's the internal Cosmos ID
-        # But we allow all other fields from the location schema
-        updatable_keys = ["location_id", "location_name", "events_ids", "rooms"]
-        updated_any_field = False
-
-        for key in updatable_keys:
-            if key in body:
-                location_doc[key] = body[key]
-                updated_any_field = True
+        # Validate only the fields being changed; the stored doc already passed the schema
+        for key, val in updates.items():
+            if key not in _field_validators:
+                continue
+            try:
+                _field_validators[key](val)
+            except fastjsonschema.JsonSchemaException as ve:
+                return {
+                    "status_code": 400,
+                    "body": {"error": f"JSON schema validation error in '{key}': {ve.message}"}
+                }
 
-        if not updated_any_field:
+        # Retrieve the existing doc
+        location_doc = _read_location_doc(LocationsContainerProxy, location_id)
+        if location_doc is None:
             return {
-                "status_code": 400,
-                "body": {"error": "No updatable fields specified in request body."}
+                "status_code": 404,
+                "body": {"error": f"Location '{location_id}' not found, cannot edit."}
             }
 
-        # If we have a location schema, validate with jsonschema
+        location_doc.update(updates)
+
+        # Replace the doc only if its etag still matches what we read, so a concurrent
+        # write in between is rejected instead of overwritten
         try:
-            jsonschema.validate(instance=location_doc, schema=location_schema)
-        except jsonschema.exceptions.ValidationError as ve:
+            LocationsContainerProxy.replace_item(
+                item=location_doc["id"],
+                body=location_doc,
+                etag=location_doc["_etag"],
+                match_condition=MatchConditions.IfNotModified
+            )
+        except CosmosAccessConditionFailedError:
             return {
-                "status_code": 400,
-                "body": {"error": f"JSON schema validation error: {str(ve)}"}
+                "status_code": 409,
+                "body": {"error": f"Location '{location_id}' was modified concurrently, please retry."}
             }
-
-        # Replace (upsert) the doc in the database
-        LocationsContainerProxy.replace_item(item=location_doc, body=location_doc)
+        invalidate_location_cache(location_id)
 
         return {
             "status_code": 200,
@@ -322,9 +460,8 @@ def edit_location(req, LocationsContainerProxy, location_schema=location_schema)
             }
         }
 
-    except Exception as e:
-        logging.error(f"Error editing location: {e}")
-        logging.error(traceback.format_exc())
+    except Exception:
+        logging.exception("Error editing location")
         return {
             "status_code": 500,
             "body": {"error": "Internal Server Error"}
@@ -3,6 +3,7 @@
 import unittest
 import uuid
 import os
+import sys
 import requests
 import json
 import jsonschema
@@ -26,6 +27,40 @@ if os.path.exists(settings_file):
 EXISTING_EVENT_ID_1 = "683f7199-cfd4-46df-89ef-98aec0e3dfca"
 EXISTING_EVENT_ID_2 = "324a9052-0378-45a5-9cd9-4a314d3aef72"
 
+# edit_location is also called in-process, to control when a concurrent write lands
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from shared_code.location_crud import edit_location
+
+
+class _JsonRequest:
+    """Minimal stand-in for func.HttpRequest carrying a JSON body."""
+    def __init__(self, body, method="POST"):
+        self.method = method
+        self.params = {}
+        self._body = json.dumps(body).encode()
+
+    def get_body(self):
+        return self._body
+
+
+class _ConcurrentWriteProxy:
+    """
+    Wraps the real locations container. Right after edit_location reads a doc,
+    another writer replaces it in Cosmos, so the etag edit_location holds is stale.
+    """
+    def __init__(self, container, concurrent_name):
+        self._container = container
+        self._concurrent_name = concurrent_name
+
+    def read_item(self, item, partition_key):
+        doc = self._container.read_item(item=item, partition_key=partition_key)
+        concurrent_doc = dict(doc, location_name=self._concurrent_name)
+        self._container.replace_item(item=doc["id"], body=concurrent_doc)
+        return doc
+
+    def __getattr__(self, name):
+        return getattr(self._container, name)
+
 
 class TestLocationCrud(unittest.TestCase):
 
@@ -76,7 +111,7 @@ class TestLocationCrud(unittest.TestCase):
         return f"{self.base_url}/delete_location"
 
     def _get_read_location_url(self) -> str:
-        return f"{self.base_url}/read_location"
+        return f"{self.base_url}/get_location"
 
     def _get_edit_location_url(self) -> str:
         return f"{self.base_url}/edit_location"
@@ -345,6 +380,148 @@ class TestLocationCrud(unittest.TestCase):
         finally:
             self._delete_in_db(location_id)
 
+    # ----------------------------------------------------------------
+    # 5. Listing locations pages through continuation_token
+    # ----------------------------------------------------------------
+    def test_5_list_locations_continuation_token(self):
+        """
+        1) Create three locations
+        2) List locations one per page, following continuation_token until it is null
+        3) Expect every created location exactly once across the pages
+        4) Cleanup in finally
+        """
+        created_ids = []
+        try:
+            for _ in range(3):
+                create_body = {
+                    "location_name": f"Paging Test {uuid.uuid4()}",
+                    "events_ids": [],
+                    "rooms": []
+                }
+                resp_create = requests.post(self._get_create_location_url(), json=create_body)
+                self.assertIn(resp_create.status_code, [200, 201, 202], f"Create failed with {resp_create.status_code}.")
+                created_ids.append(resp_create.json()["location_id"])
+
+            seen_ids = []
+            pages = 0
+            list_body = {"limit": 1}
+            while True:
+                resp_list = requests.post(self._get_read_location_url(), json=list_body)
+                self.assertEqual(resp_list.status_code, 200, f"List returned unexpected code: {resp_list.status_code}")
+                data = resp_list.json()
+                self.assertIn("locations", data, "Expected a 'locations' page in response.")
+                self.assertIn("continuation_token", data, "Expected 'continuation_token' in response.")
+                self.assertLessEqual(len(data["locations"]), 1, "Page larger than the requested limit.")
+
+                seen_ids.extend(loc.get("location_id") for loc in data["locations"])
+                pages += 1
+                if not data["continuation_token"]:
+                    break
+                list_body = {"limit": 1, "continuation_token": data["continuation_token"]}
+
+            self.assertGreaterEqual(pages, len(created_ids), "Expected at least one page per created location.")
+            for location_id in created_ids:
+                self.assertEqual(seen_ids.count(location_id), 1, f"Location '{location_id}' not listed exactly once.")
+        finally:
+            for location_id in created_ids:
+                self._delete_in_db(location_id)
+
+    # ----------------------------------------------------------------
+    # 6. Listing locations with an invalid limit should fail
+    # ----------------------------------------------------------------
+    def test_6_list_locations_invalid_limit(self):
+        """
+        GET the location list with out-of-range and non-integer limits, then POST
+        JSON limits that int() would coerce (bool, non-integral float, string).
+        We expect a 400 for each. Nothing is created, so no cleanup needed.
+        """
+        for limit in [0, "abc"]:
+            resp = requests.get(self._get_read_location_url(), params={"limit": limit})
+            self.assertEqual(resp.status_code, 400, f"[limit={limit}] Expected 400 but got {resp.status_code}.")
+            self.assertIn("error", resp.json(), f"[limit={limit}] 'error' message expected in response body.")
+
+        for limit in [True, 2.9, "5"]:
+            resp = requests.post(self._get_read_location_url(), json={"limit": limit})
+            self.assertEqual(resp.status_code, 400, f"[limit={limit!r}] Expected 400 but got {resp.status_code}.")
+            self.assertIn("error", resp.json(), f"[limit={limit!r}] 'error' message expected in response body.")
+
+    # ----------------------------------------------------------------
+    # 7. Listed locations are projected to location_id, location_name and rooms
+    # ----------------------------------------------------------------
+    def test_7_list_locations_projection(self):
+        """
+        1) Create a location with events_ids
+        2) List all pages of locations
+        3) Expect every entry to contain only location_id, location_name and rooms,
+           and the created location to be listed without its events_ids
+        4) Cleanup in finally
+        """
+        location_id = None
+        try:
+            create_body = {
+                "location_name": f"Projection Test {uuid.uuid4()}",
+                "events_ids": [{"event_id": EXISTING_EVENT_ID_1}],
+                "rooms": [{"room_name": "Room P", "capacity": 10}]
+            }
+            resp_create = requests.post(self._get_create_location_url(), json=create_body)
+            self.assertIn(resp_create.status_code, [200, 201, 202], f"Create failed with {resp_create.status_code}.")
+            location_id = resp_create.json()["location_id"]
+
+            projected_fields = {"location_id", "location_name", "rooms"}
+            created_entry = None
+            list_body = {}
+            while True:
+                resp_list = requests.post(self._get_read_location_url(), json=list_body)
+                self.assertEqual(resp_list.status_code, 200, f"List returned unexpected code: {resp_list.status_code}")
+                data = resp_list.json()
+                for loc in data["locations"]:
+                    self.assertLessEqual(set(loc), projected_fields, f"Unexpected fields in listed location: {set(loc)}")
+                    if loc.get("location_id") == location_id:
+                        created_entry = loc
+                if not data["continuation_token"]:
+                    break
+                list_body = {"continuation_token": data["continuation_token"]}
+
+            self.assertIsNotNone(created_entry, "Created location missing from the list.")
+            self.assertEqual(set(created_entry), projected_fields)
+            self.assertEqual(created_entry["location_name"], create_body["location_name"])
+        finally:
+            self._delete_in_db(location_id)
+
+    # ----------------------------------------------------------------
+    # 8. Editing a location that changed since it was read should conflict
+    # ----------------------------------------------------------------
+    def test_8_edit_location_concurrent_modification(self):
+        """
+        1) Create a location directly in DB
+        2) Run edit_location with a container proxy that writes the doc between
+           edit_location's read and its etag-conditioned replace
+        3) Expect 409, and the concurrent write to be kept
+        4) Cleanup in finally
+        """
+        location_id = str(uuid.uuid4())
+        try:
+            self.locations_container.create_item({
+                "id": location_id,
+                "location_id": location_id,
+                "location_name": "Concurrent Edit Original",
+                "events_ids": [],
+                "rooms": []
+            })
+
+            proxy = _ConcurrentWriteProxy(self.locations_container, "Concurrent Edit Other Writer")
+            result = edit_location(
+                _JsonRequest({"location_id": location_id, "location_name": "Concurrent Edit Mine"}),
+                proxy
+            )
+            self.assertEqual(result["status_code"], 409, f"Expected 409, got {result['status_code']}.")
+            self.assertIn("error", result["body"])
+
+            stored_doc = self.locations_container.read_item(item=location_id, partition_key=location_id)
+            self.assertEqual(stored_doc["location_name"], "Concurrent Edit Other Writer")
+        finally:
+            self._delete_in_db(location_id)
+
 
 if __name__ == '__main__':
     unittest.main()